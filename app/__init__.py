@@ -1,19 +1,39 @@
-from flask import Flask
 from dotenv import load_dotenv
 import os
-from app.models.database import init_db
-from app.api.routes import api_bp
+import tempfile
 
 load_dotenv()
 
 def create_app():
+    # Imported here so that the Celery worker, which loads the app package via
+    # app.workers, does not pull in the web stack.
+    from flask import Flask
+    from app.models.database import init_db, create_schema
+    from app.api.routes import api_bp
+    
     app = Flask(__name__)
     
     app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL')
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     
+    # Uploads are read back by the Celery workers, so outside debug mode the
+    # folder has to be configured explicitly (and shared with the workers).
+    upload_folder = os.getenv('UPLOAD_FOLDER')
+    if not upload_folder:
+        if not app.debug:
+            raise RuntimeError('UPLOAD_FOLDER must be set to a directory shared with the Celery workers')
+        upload_folder = os.path.join(tempfile.gettempdir(), 'image_processor_uploads')
+        app.logger.warning(f"UPLOAD_FOLDER is not set, using {upload_folder}; workers on other hosts cannot read it")
+    app.config['UPLOAD_FOLDER'] = upload_folder
+    
     init_db(app)
     
     app.register_blueprint(api_bp, url_prefix='/api')
     
+    @app.cli.command('init-db')
+    def init_db_command():
+        """Create the database tables."""
+        create_schema(app)
+        print("Database tables created.")
+    
     return app
\ No newline at end of file
@@ -1,8 +1,8 @@
-from flask import request, jsonify, Blueprint, send_file
+from flask import request, jsonify, Blueprint, send_file, current_app
 from werkzeug.utils import secure_filename
 import uuid
 import os
-import pandas as pd
+import csv
 import tempfile
 import requests
 import re
@@ -11,13 +11,16 @@ import threading
 import shutil
 from datetime import datetime
 from app.models.database import db, Request, Product
-from app.workers.tasks import process_images, send_webhook_notification
 from app.utils.utils_generator import generate_output_csv
 
 logger = logging.getLogger(__name__)
 
 api_bp = Blueprint('api', __name__)
 
+def enqueue_task(task_name, *args):
+    from app.workers import celery
+    celery.send_task(f'app.workers.tasks.{task_name}', args=args)
+
 @api_bp.route('/upload', methods=['POST'])
 def upload_csv():
     if 'file' not in request.files:
@@ -31,56 +34,57 @@ def upload_csv():
     if file and file.filename.endswith('.csv'):
         request_id = str(uuid.uuid4())
         
-        temp_dir = tempfile.gettempdir()
+        upload_dir = current_app.config['UPLOAD_FOLDER']
+        os.makedirs(upload_dir, exist_ok=True)
         filename = secure_filename(file.filename)
-        temp_path = os.path.join(temp_dir, filename)
-        file.save(temp_path)
+        upload_path = os.path.join(upload_dir, f'{request_id}_{filename}')
+        file.save(upload_path)
         
         try:
-            df = pd.read_csv(temp_path)
+            # Same reader as the ingest_csv task, so an accepted header is parsed
+            # the same way by the worker.
+            with open(upload_path, newline='', encoding='utf-8-sig') as f:
+                header = csv.DictReader(f).fieldnames or []
+            
             required_columns = ['S. No.', 'Product Name', 'Input Image Urls']
-            if not all(col in df.columns for col in required_columns):
+            if not all(col in header for col in required_columns):
+                os.remove(upload_path)
                 return jsonify({'error': 'CSV missing required columns'}), 400
             
             new_request = Request(request_id=request_id, status='PENDING')
             db.session.add(new_request)
             db.session.commit()
             
-            for _, row in df.iterrows():
-                product = Product(
-                    request_id=request_id,
-                    serial_number=row['S. No.'],
-                    product_name=row['Product Name'],
-                    input_image_urls=row['Input Image Urls'],
-                    status='PENDING'
-                )
-                db.session.add(product)
-            
-            db.session.commit()
-            logger.info(f"Request {request_id} created successfully")
-            
-            process_images.delay(request_id)
-            
-            return jsonify({'request_id': request_id}), 201
-            
         except Exception as e:
             db.session.rollback()
             logger.exception(f"Error processing CSV upload: {str(e)}")
+            if os.path.exists(upload_path):
+                os.remove(upload_path)
             return jsonify({'error': f'Invalid CSV format: {str(e)}'}), 400
-        finally:
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
+        
+        try:
+            enqueue_task('ingest_csv', request_id, upload_path)
+        except Exception as e:
+            logger.exception(f"Error queueing ingestion for request {request_id}: {str(e)}")
+            new_request.status = 'FAILED'
+            db.session.commit()
+            if os.path.exists(upload_path):
+                os.remove(upload_path)
+            return jsonify({'error': 'Failed to queue CSV for processing', 'request_id': request_id}), 503
+        
+        logger.info(f"Request {request_id} accepted, queued for ingestion")
+        return jsonify({'request_id': request_id}), 202
     
     return jsonify({'error': 'Invalid file type. Only CSV files are allowed.'}), 400
 
 @api_bp.route('/status/<request_id>', methods=['GET'])
 def check_status(request_id):
-    req = Request.query.filter_by(request_id=request_id).first()
+    req = db.session.query(Request).filter_by(request_id=request_id).first()
     
     if not req:
         return jsonify({'error': 'Request not found'}), 404
     
-    products = Product.query.filter_by(request_id=request_id).all()
+    products = db.session.query(Product).filter_by(request_id=request_id).all()
     
     total_products = len(products)
     completed_products = sum(1 for p in products if p.status == 'COMPLETED')
@@ -127,7 +131,7 @@ def register_webhook():
     if not validate_webhook_url(data['webhook_url']):
         return jsonify({'error': 'Invalid webhook URL format'}), 400
     
-    req = Request.query.filter_by(request_id=data['request_id']).first()
+    req = db.session.query(Request).filter_by(request_id=data['request_id']).first()
     
     if not req:
         return jsonify({'error': 'Request not found'}), 404
@@ -148,7 +152,7 @@ def register_webhook():
         logger.error(f"Webhook test failed: {str(e)}")
     
     if req.status in ['COMPLETED', 'PARTIALLY_COMPLETED', 'FAILED']:
-        send_webhook_notification.delay(data['request_id'])
+        enqueue_task('send_webhook_notification', data['request_id'])
         trigger_message = "Processing already complete. Webhook notification queued."
     else:
         trigger_message = "Webhook will be triggered when processing completes."
@@ -162,7 +166,7 @@ def register_webhook():
 
 @api_bp.route('/trigger-webhook/<request_id>', methods=['POST'])
 def trigger_webhook(request_id):
-    req = Request.query.filter_by(request_id=request_id).first()
+    req = db.session.query(Request).filter_by(request_id=request_id).first()
     
     if not req:
         return jsonify({'error': 'Request not found'}), 404
@@ -171,7 +175,7 @@ def trigger_webhook(request_id):
         return jsonify({'error': 'No webhook URL registered for this request'}), 400
     
     logger.info(f"Manually triggering webhook for request {request_id}")
-    send_webhook_notification.delay(request_id)
+    enqueue_task('send_webhook_notification', request_id)
     
     return jsonify({
         'message': 'Webhook notification queued',
@@ -225,7 +229,7 @@ def cleanup_temp_dir(temp_dir):
 @api_bp.route('/download/<request_id>', methods=['GET'])
 def download_csv(request_id):
     try:
-        req = Request.query.filter_by(request_id=request_id).first()
+        req = db.session.query(Request).filter_by(request_id=request_id).first()
         if not req:
             return jsonify({'error': 'Request not found'}), 404
         
@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey
+from sqlalchemy.orm import declarative_base
+from datetime import datetime
+
+# Plain SQLAlchemy models, so the Celery worker can use them without Flask.
+# The web app binds Flask-SQLAlchemy to the same metadata in database.py.
+Base = declarative_base()
+
+class Request(Base):
+    __tablename__ = 'requests'
+    
+    id = Column(Integer, primary_key=True)
+    request_id = Column(String(36), unique=True, nullable=False)
+    status = Column(String(20), nullable=False, default='PENDING')  # PENDING, INGESTING, PROCESSING, COMPLETED, PARTIALLY_COMPLETED, FAILED
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+    webhook_url = Column(String(255), nullable=True)
+
+class Product(Base):
+    __tablename__ = 'products'
+    
+    id = Column(Integer, primary_key=True)
+    request_id = Column(String(36), ForeignKey('requests.request_id'), nullable=False)
+    serial_number = Column(Integer, nullable=False)
+    product_name = Column(String(255), nullable=False)
+    input_image_urls = Column(Text, nullable=False) 
+    output_image_urls = Column(Text, nullable=True) 
+    status = Column(String(20), nullable=False, default='PENDING')
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
\ No newline at end of file
@@ -1,4 +1,3 @@
-from PIL import Image
 import requests
 from io import BytesIO
 import os
@@ -11,6 +10,8 @@ logger = logging.getLogger(__name__)
 class ImageProcessor:
     @staticmethod
     def compress_image(image_url, quality=50, max_retries=3):
+        from PIL import Image
+        
         retry_count = 0
         last_error = None
         
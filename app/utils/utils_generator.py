@@ -1,6 +1,5 @@
-import pandas as pd
 import logging
-from app.models.database import Product
+from app.models.tables import Product
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +15,7 @@ def generate_output_csv(request_id, output_path):
         bool: True if successful, False otherwise
     """
     try:
+        import pandas as pd
         from sqlalchemy import create_engine
         from sqlalchemy.orm import sessionmaker
         import os
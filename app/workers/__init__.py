@@ -7,9 +7,8 @@ load_dotenv()
 celery = Celery(
     'image_processor',
     broker=os.getenv('CELERY_BROKER_URL'),
-    backend=os.getenv('CELERY_RESULT_BACKEND')
+    backend=os.getenv('CELERY_RESULT_BACKEND'),
+    include=['app.workers.tasks']
 )
 
-celery.config_from_object('celeryconfig')
-
-from app.workers.tasks import *
\ No newline at end of file
+celery.config_from_object('celeryconfig')
\ No newline at end of file
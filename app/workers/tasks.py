@@ -1,9 +1,10 @@
 from app.workers import celery
 from app.services.image_processor import ImageProcessor
-from app.models.database import db, Request, Product
-from flask import current_app
+from app.models.tables import Request, Product
 import requests
 import os
+import csv
+import itertools
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
@@ -18,8 +19,16 @@ logger = logging.getLogger(__name__)
 
 load_dotenv()
 
-engine = create_engine(os.getenv('DATABASE_URL'))
-Session = sessionmaker(bind=engine)
+INGEST_BATCH_SIZE = int(os.getenv('INGEST_BATCH_SIZE', 100))
+
+_session_factory = None
+
+def get_session():
+    global _session_factory
+    if _session_factory is None:
+        engine = create_engine(os.getenv('DATABASE_URL'))
+        _session_factory = sessionmaker(bind=engine)
+    return _session_factory()
 
 def send_webhook_with_retry(webhook_url, payload, max_retries=3, initial_delay=1):
     for attempt in range(max_retries):
@@ -46,7 +55,7 @@ def send_webhook_with_retry(webhook_url, payload, max_retries=3, initial_delay=1
 
 @celery.task
 def send_webhook_notification(request_id):
-    session = Session()
+    session = get_session()
     
     try:
         request = session.query(Request).filter_by(request_id=request_id).first()
@@ -87,9 +96,91 @@ def send_webhook_notification(request_id):
     finally:
         session.close()
 
-@celery.task
-def process_images(request_id):
-    session = Session()
+def process_product(session, product):
+    try:
+        product.status = 'PROCESSING'
+        session.commit()
+        
+        input_urls = product.input_image_urls.split(',')
+        output_urls = []
+        
+        for url in input_urls:
+            url = url.strip()
+            if url:
+                try:
+                    logger.info(f"Processing image: {url}")
+                    compressed_path = ImageProcessor.compress_image(url)
+                    
+                    input_filename = url.split('/')[-1]
+                    output_url = f"https://www.public-image-output-{input_filename}"
+                    output_urls.append(output_url)
+                    
+                    if os.path.exists(compressed_path):
+                        os.remove(compressed_path)
+                        
+                except Exception as e:
+                    logger.error(f"Error processing image {url}: {str(e)}")
+        
+        product.output_image_urls = ','.join(output_urls)
+        product.status = 'COMPLETED'
+        session.commit()
+        
+    except Exception as e:
+        logger.error(f"Error processing product {product.id}: {str(e)}")
+        product.status = 'FAILED'
+        session.commit()
+
+def finalize_request(session, request_id):
+    # Only a request in PROCESSING (i.e. fully ingested) can be finalized, and the
+    # conditional update makes sure concurrent batches notify the webhook once.
+    all_products = session.query(Product).filter_by(request_id=request_id).all()
+    statuses = [p.status for p in all_products]
+    
+    if any(status in ['PENDING', 'PROCESSING'] for status in statuses):
+        return
+    
+    if all(status == 'COMPLETED' for status in statuses):
+        final_status = 'COMPLETED'
+    elif any(status == 'FAILED' for status in statuses):
+        final_status = 'PARTIALLY_COMPLETED'
+    else:
+        return
+    
+    updated = session.query(Request).filter_by(
+        request_id=request_id, status='PROCESSING'
+    ).update({'status': final_status}, synchronize_session=False)
+    session.commit()
+    
+    if not updated:
+        return
+    
+    request = session.query(Request).filter_by(request_id=request_id).first()
+    if request.webhook_url:
+        logger.info(f"Scheduling webhook notification for request {request_id}")
+        send_webhook_notification.delay(request_id)
+    else:
+        logger.info(f"No webhook URL registered for request {request_id}")
+
+def is_request_failed(session, request_id):
+    status = session.query(Request.status).filter_by(request_id=request_id).scalar()
+    return status == 'FAILED'
+
+def fail_request(session, request_id):
+    session.rollback()
+    request = session.query(Request).filter_by(request_id=request_id).first()
+    if request and request.status != 'FAILED':
+        request.status = 'FAILED'
+        session.commit()
+        
+        if request.webhook_url:
+            send_webhook_notification.delay(request_id)
+
+# acks_late and reject_on_worker_lost make the broker redeliver the message if
+# the worker dies mid-ingest. A redelivered run skips the rows that are already
+# stored, so it does not insert duplicates.
+@celery.task(acks_late=True, reject_on_worker_lost=True)
+def ingest_csv(request_id, upload_path):
+    session = get_session()
     
     try:
         request = session.query(Request).filter_by(request_id=request_id).first()
@@ -97,72 +188,120 @@ def process_images(request_id):
             logger.warning(f"Request {request_id} not found")
             return
         
-        logger.info(f"Starting processing for request {request_id}")
-        logger.info(f"Request webhook URL: {request.webhook_url}")
+        if request.status not in ['PENDING', 'INGESTING']:
+            logger.info(f"Request {request_id} already ingested (status {request.status}), skipping")
+            return
+        
+        logger.info(f"Starting ingestion for request {request_id} from {upload_path}")
         
-        request.status = 'PROCESSING'
+        request.status = 'INGESTING'
         session.commit()
         
-        products = session.query(Product).filter_by(request_id=request_id).all()
+        # Batches committed by an interrupted run. Their process_images task may
+        # never have been queued, so the pending ones are queued again; the task
+        # ignores products that are no longer PENDING.
+        stored = session.query(Product.id, Product.status).filter_by(
+            request_id=request_id
+        ).order_by(Product.id).all()
+        pending_ids = [product_id for product_id, status in stored if status == 'PENDING']
+        for start in range(0, len(pending_ids), INGEST_BATCH_SIZE):
+            process_images.delay(request_id, pending_ids[start:start + INGEST_BATCH_SIZE])
         
-        for product in products:
-            try:
-                product.status = 'PROCESSING'
-                session.commit()
-                
-                input_urls = product.input_image_urls.split(',')
-                output_urls = []
-                
-                for url in input_urls:
-                    url = url.strip()
-                    if url:
-                        try:
-                            logger.info(f"Processing image: {url}")
-                            compressed_path = ImageProcessor.compress_image(url)
-                            
-                            input_filename = url.split('/')[-1]
-                            output_url = f"https://www.public-image-output-{input_filename}"
-                            output_urls.append(output_url)
-                            
-                            if os.path.exists(compressed_path):
-                                os.remove(compressed_path)
-                                
-                        except Exception as e:
-                            logger.error(f"Error processing image {url}: {str(e)}")
+        total = len(stored)
+        if total:
+            logger.info(f"Resuming ingestion for request {request_id} after {total} stored products")
+        
+        with open(upload_path, newline='', encoding='utf-8-sig') as f:
+            reader = itertools.islice(csv.DictReader(f), total, None)
+            
+            while True:
+                rows = list(itertools.islice(reader, INGEST_BATCH_SIZE))
+                if not rows:
+                    break
                 
-                product.output_image_urls = ','.join(output_urls)
-                product.status = 'COMPLETED'
+                products = [
+                    Product(
+                        request_id=request_id,
+                        serial_number=int(row['S. No.']),
+                        product_name=row['Product Name'],
+                        input_image_urls=row['Input Image Urls'],
+                        status='PENDING'
+                    )
+                    for row in rows
+                ]
+                session.add_all(products)
+                session.flush()
+                product_ids = [p.id for p in products]
                 session.commit()
                 
-            except Exception as e:
-                logger.error(f"Error processing product {product.id}: {str(e)}")
-                product.status = 'FAILED'
-                session.commit()
-        
-        all_products = session.query(Product).filter_by(request_id=request_id).all()
-        statuses = [p.status for p in all_products]
+                total += len(product_ids)
+                logger.info(f"Ingested {total} products for request {request_id}")
+                process_images.delay(request_id, product_ids)
+                
+                if is_request_failed(session, request_id):
+                    logger.warning(f"Request {request_id} failed during ingestion, stopping")
+                    return
         
-        if all(status == 'COMPLETED' for status in statuses):
-            request.status = 'COMPLETED'
-        elif any(status == 'FAILED' for status in statuses):
-            request.status = 'PARTIALLY_COMPLETED'
+        # A failed batch may already have moved the request to FAILED, which
+        # must not be overwritten.
+        updated = session.query(Request).filter_by(
+            request_id=request_id, status='INGESTING'
+        ).update({'status': 'PROCESSING'}, synchronize_session=False)
         session.commit()
+        logger.info(f"Ingestion finished for request {request_id}: {total} products")
         
-        if request.webhook_url:
-            logger.info(f"Scheduling webhook notification for request {request_id}")
-            send_webhook_notification.delay(request_id)
-        else:
-            logger.info(f"No webhook URL registered for request {request_id}")
+        if updated:
+            finalize_request(session, request_id)
     
     except Exception as e:
-        logger.exception(f"Error processing request {request_id}: {str(e)}")
+        logger.exception(f"Error ingesting request {request_id}: {str(e)}")
+        fail_request(session, request_id)
+    
+    finally:
+        session.close()
+        if os.path.exists(upload_path):
+            os.remove(upload_path)
+
+@celery.task
+def process_images(request_id, product_ids):
+    session = get_session()
+    
+    try:
         request = session.query(Request).filter_by(request_id=request_id).first()
-        if request:
-            request.status = 'FAILED'
-            session.commit()
+        if not request:
+            logger.warning(f"Request {request_id} not found")
+            return
+        
+        logger.info(f"Processing batch of {len(product_ids)} products for request {request_id}")
+        products = session.query(Product).filter(
+            Product.request_id == request_id,
+            Product.id.in_(product_ids)
+        ).all()
+        
+        for product in products:
+            # A redelivered ingestion can queue a product twice; only the first
+            # batch to reach it processes it.
+            if product.status != 'PENDING':
+                continue
+            
+            # Once the request has failed (e.g. a parse error later in the CSV),
+            # the remaining products of queued batches are failed without
+            # downloading their images.
+            if is_request_failed(session, request_id):
+                logger.warning(f"Request {request_id} has failed, skipping remaining products in batch")
+                for remaining in products:
+                    if remaining.status == 'PENDING':
+                        remaining.status = 'FAILED'
+                session.commit()
+                return
             
-            if request.webhook_url:
-                send_webhook_notification.delay(request_id)
+            process_product(session, product)
+        
+        finalize_request(session, request_id)
+    
+    except Exception as e:
+        logger.exception(f"Error processing request {request_id}: {str(e)}")
+        fail_request(session, request_id)
     
     finally:
         session.close()
\ No newline at end of file
@@ -0,0 +1,81 @@
+import subprocess
+import sys
+
+HEAVY_MODULES = ['pandas', 'PIL', 'celery', 'sqlalchemy', 'flask']
+
+TARGETS = {
+    'api': "from app import create_app; create_app()",
+    'worker': "import app.workers; import app.workers.tasks",
+}
+
+# Emulates the old eager layout: every process imported pandas, Pillow, the
+# routes and the tasks module, and the tasks module created its engine on import.
+BASELINE_TARGETS = {
+    'api': (
+        "import pandas; from PIL import Image; import app.workers.tasks; "
+        "app.workers.tasks.get_session().close(); "
+        "from app import create_app; create_app()"
+    ),
+    'worker': (
+        "import pandas; from PIL import Image; import app.api.routes; import app.workers.tasks; "
+        "app.workers.tasks.get_session().close()"
+    ),
+}
+
+# ru_maxrss is reported in kilobytes on Linux and in bytes on macOS. The
+# resource module does not exist on Windows, where memory is reported as n/a.
+PROBE = """
+import sys, time
+start = time.perf_counter()
+{code}
+elapsed = (time.perf_counter() - start) * 1000
+try:
+    import resource
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        rss_kb //= 1024
+except ImportError:
+    rss_kb = -1
+loaded = [m for m in {heavy!r} if m in sys.modules]
+print(f"{{elapsed:.1f}} {{rss_kb}} {{','.join(loaded)}}")
+"""
+
+def measure(code, runs):
+    timings = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, '-c', PROBE.format(code=code, heavy=HEAVY_MODULES)],
+            check=True,
+            stdout=subprocess.PIPE,
+            text=True
+        )
+        elapsed, rss, loaded = (result.stdout.strip().split(' ') + [''])[:3]
+        timings.append((float(elapsed), int(rss), loaded))
+    return timings
+
+def summarize(timings):
+    best = min(t[0] for t in timings)
+    rss = max(t[1] for t in timings)
+    loaded = timings[-1][2] or '-'
+    return best, rss, loaded
+
+def format_rss(rss_kb):
+    return 'n/a' if rss_kb < 0 else f"{rss_kb / 1024:.1f} MB"
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    
+    for name, code in TARGETS.items():
+        best, rss, loaded = summarize(measure(code, runs))
+        base_best, base_rss, base_loaded = summarize(measure(BASELINE_TARGETS[name], runs))
+        
+        print(f"{name}:")
+        print(f"  baseline  import time: {base_best:8.1f} ms   max RSS: {format_rss(base_rss):>10}   heavy modules: {base_loaded}")
+        print(f"  current   import time: {best:8.1f} ms   max RSS: {format_rss(rss):>10}   heavy modules: {loaded}")
+        if rss >= 0 and base_rss >= 0:
+            print(f"  saved     import time: {base_best - best:8.1f} ms   max RSS: {(base_rss - rss) / 1024:7.1f} MB")
+        else:
+            print(f"  saved     import time: {base_best - best:8.1f} ms")
+
+if __name__ == "__main__":
+    main()
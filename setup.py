@@ -65,9 +65,11 @@ def main():
     
     print("\nSetup completed successfully!")
     print("\nTo start the application:")
-    print("1. Start the Flask server:")
+    print("1. Create the database tables:")
+    print("   FLASK_APP=run.py flask init-db")
+    print("2. Start the Flask server:")
     print("   python run.py")
-    print("2. In a separate terminal, start the Celery worker:")
+    print("3. In a separate terminal, start the Celery worker:")
     print("   celery -A app.workers worker --loglevel=info")
 
 if __name__ == "__main__":
@@ -0,0 +1,125 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.tables import Base, Request, Product
+from app.workers import tasks
+
+HEADER = 'S. No.,Product Name,Input Image Urls\n'
+
+@pytest.fixture
+def worker(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(engine)
+    monkeypatch.setattr(tasks, '_session_factory', sessionmaker(bind=engine))
+    
+    queued_batches = []
+    webhooks = []
+    downloads = []
+    monkeypatch.setattr(tasks.process_images, 'delay', lambda *args: queued_batches.append(args))
+    monkeypatch.setattr(tasks.send_webhook_notification, 'delay', lambda request_id: webhooks.append(request_id))
+    monkeypatch.setattr(tasks.ImageProcessor, 'compress_image', lambda url: downloads.append(url) or str(tmp_path / 'missing.jpg'))
+    
+    return SimpleNamespace(
+        tmp_path=tmp_path,
+        queued_batches=queued_batches,
+        webhooks=webhooks,
+        downloads=downloads
+    )
+
+def create_request(worker, rows):
+    request_id = str(uuid.uuid4())
+    upload_path = worker.tmp_path / f'{request_id}.csv'
+    upload_path.write_text(HEADER + ''.join(rows), encoding='utf-8')
+    
+    session = tasks.get_session()
+    session.add(Request(request_id=request_id, status='PENDING', webhook_url='http://localhost/hook'))
+    session.commit()
+    session.close()
+    return request_id, str(upload_path)
+
+def request_state(request_id):
+    session = tasks.get_session()
+    status = session.query(Request.status).filter_by(request_id=request_id).scalar()
+    products = sorted(p.status for p in session.query(Product).filter_by(request_id=request_id))
+    session.close()
+    return status, products
+
+def test_header_only_csv_completes(worker):
+    request_id, upload_path = create_request(worker, [])
+    
+    tasks.ingest_csv(request_id, upload_path)
+    
+    assert request_state(request_id) == ('COMPLETED', [])
+    assert worker.queued_batches == []
+    assert worker.webhooks == [request_id]
+
+def test_parse_error_in_later_chunk_fails_queued_batches(worker, monkeypatch):
+    monkeypatch.setattr(tasks, 'INGEST_BATCH_SIZE', 2)
+    request_id, upload_path = create_request(worker, [
+        '1,A,http://img/1.jpg\n',
+        '2,B,http://img/2.jpg\n',
+        'three,C,http://img/3.jpg\n',
+    ])
+    
+    tasks.ingest_csv(request_id, upload_path)
+    
+    assert request_state(request_id) == ('FAILED', ['PENDING', 'PENDING'])
+    assert len(worker.queued_batches) == 1
+    
+    tasks.process_images(*worker.queued_batches[0])
+    
+    assert request_state(request_id) == ('FAILED', ['FAILED', 'FAILED'])
+    assert worker.downloads == []
+    assert worker.webhooks == [request_id]
+
+def test_webhook_sent_once_when_last_batch_races_end_of_ingestion(worker):
+    request_id, upload_path = create_request(worker, ['1,A,http://img/1.jpg\n'])
+    
+    tasks.ingest_csv(request_id, upload_path)
+    assert request_state(request_id) == ('PROCESSING', ['PENDING'])
+    
+    # Both the last batch and a concurrent finalize (e.g. from the end of
+    # ingestion) see every product done; only one may move the request.
+    tasks.process_images(*worker.queued_batches[0])
+    session = tasks.get_session()
+    tasks.finalize_request(session, request_id)
+    session.close()
+    
+    assert request_state(request_id) == ('COMPLETED', ['COMPLETED'])
+    assert worker.webhooks == [request_id]
+
+def test_batch_finishing_during_ingestion_is_finalized_by_ingestion(worker, monkeypatch):
+    monkeypatch.setattr(tasks.process_images, 'delay', lambda *args: tasks.process_images(*args))
+    request_id, upload_path = create_request(worker, ['1,A,http://img/1.jpg\n'])
+    
+    tasks.ingest_csv(request_id, upload_path)
+    
+    assert request_state(request_id) == ('COMPLETED', ['COMPLETED'])
+    assert worker.webhooks == [request_id]
+
+def test_redelivered_ingestion_does_not_duplicate_rows(worker, monkeypatch):
+    monkeypatch.setattr(tasks, 'INGEST_BATCH_SIZE', 2)
+    request_id, upload_path = create_request(worker, [
+        '1,A,http://img/1.jpg\n',
+        '2,B,http://img/2.jpg\n',
+        '3,C,http://img/3.jpg\n',
+    ])
+    
+    # Simulate a run that stored the first batch and then died.
+    session = tasks.get_session()
+    session.query(Request).filter_by(request_id=request_id).update({'status': 'INGESTING'})
+    session.add_all([
+        Product(request_id=request_id, serial_number=1, product_name='A', input_image_urls='http://img/1.jpg'),
+        Product(request_id=request_id, serial_number=2, product_name='B', input_image_urls='http://img/2.jpg'),
+    ])
+    session.commit()
+    session.close()
+    
+    tasks.ingest_csv(request_id, upload_path)
+    
+    assert request_state(request_id) == ('PROCESSING', ['PENDING', 'PENDING', 'PENDING'])
+    assert sorted(len(batch[1]) for batch in worker.queued_batches) == [1, 2]